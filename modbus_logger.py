@@ -1,11 +1,17 @@
 import os
 import sys
 import time
+import queue
+import socket
+import atexit
+import asyncio
+import inspect
 import importlib
 import logging
-from pymodbus.client import ModbusSerialClient, ModbusTcpClient
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
+from pymodbus.client import AsyncModbusTcpClient, ModbusSerialClient, ModbusTcpClient
 from utils.validate_config import validate_config
-from utils.common_utils import get_csv_path_daily, show_disk_usage_bar, get_log_path, cleanup_old_logs, set_log_file
+from utils.common_utils import get_csv_path_daily, show_disk_usage_bar, cleanup_old_logs, ThreadedRowSink
 
 
 # --- Verify command-line argument ---
@@ -35,31 +41,84 @@ FILE_SUFFIX = log_cfg["file_suffix"]
 HEADER = log_cfg.get("header", [])
 TIME_STEP = log_cfg["time_step"]
 BASE_FOLDER = log_cfg["base_folder"]
+DB_FILE = log_cfg.get("db_file")  # optional: route rows to SQLite instead of CSV
 LOG_FOLDER = os.path.join(BASE_FOLDER, "logs")
 
 
 os.makedirs(LOG_FOLDER, exist_ok=True)
 
 # === Configure logger ===
-log_path = get_log_path(LOG_FOLDER)
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.FileHandler(log_path, mode="a"),
-        logging.StreamHandler(sys.stdout),
-    ],
+# The hot loop only enqueues records (in-memory put); a background
+# QueueListener thread does the actual file/stdout writes so disk
+# latency never blocks the Modbus polling cadence.
+# TimedRotatingFileHandler rotates the file at midnight on its own
+# (rotated files get a .YYYY-MM-DD suffix) and backupCount prunes old
+# ones, so the poll loop never swaps handlers or scans the folder.
+log_formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
+file_handler = TimedRotatingFileHandler(
+    os.path.join(LOG_FOLDER, "modbus_logger.log"),
+    when="midnight",
+    backupCount=LOG_RETENTION_DAYS,
 )
+file_handler.setFormatter(log_formatter)
+stream_handler = logging.StreamHandler(sys.stdout)
+stream_handler.setFormatter(log_formatter)
+
+log_queue = queue.SimpleQueue()
+log_listener = QueueListener(log_queue, file_handler, stream_handler)
+log_listener.start()
+atexit.register(log_listener.stop)  # flush pending records on any exit path
+
+# Attach the QueueHandler directly (basicConfig would stamp its own
+# formatter on it and records would get formatted twice)
+root_logger = logging.getLogger()
+root_logger.setLevel(logging.INFO)
+root_logger.addHandler(QueueHandler(log_queue))
 
 logger = logging.getLogger(__name__)
 logger.info("[main] Starting Modbus Data Logger")
 logger.info(f"[main] Using configuration file: {CONFIG_PATH}")
 
 
-# === Initialize Modbus client ===
+# === Dynamically import device-specific function ===
 try:
+    device_module = importlib.import_module("utils.device_specific_func")
+    device_func = getattr(device_module, device_cfg["name"])
+except (ImportError, AttributeError):
+    logger.error(f"[main] Could not load device function '{device_cfg['name']}' from utils/device_specific_func.py")
+    sys.exit(1)
+
+# Async device functions gather all per-device reads for uniform error
+# fan-in; pymodbus serializes the transactions themselves, so this is
+# not a latency win. Only valid on TCP (an RTU serial bus is half duplex)
+IS_ASYNC = inspect.iscoroutinefunction(device_func)
+
+# === Optional SQLite sink ===
+# With "db_file" set in the logging config, rows go to a WAL-mode SQLite
+# database instead of daily CSV files (export offline via utils.sqlite_sink).
+if DB_FILE:
+    try:
+        from utils.sqlite_sink import SqliteSink
+        device_module.csv_appender = SqliteSink(DB_FILE, FILE_SUFFIX, HEADER)
+        logger.info(f"[main] Logging rows to SQLite database: {DB_FILE} (table '{FILE_SUFFIX}')")
+    except Exception as e:
+        logger.error(f"[main] Failed to open SQLite sink '{DB_FILE}': {e}")
+        sys.exit(1)
+
+# Hand actual row writing to a background thread so a stalled disk never
+# delays the next Modbus transaction; the poll loop only enqueues
+device_module.csv_appender = ThreadedRowSink(device_module.csv_appender)
+
+
+
+# === Initialize Modbus client ===
+def build_client():
+    """Construct the Modbus client from the config. Async clients must be
+    built inside the running event loop, so main_async calls this itself."""
     if modbus_cfg["type"].lower() == "serial":
-        client = ModbusSerialClient(
+        if IS_ASYNC:
+            raise ValueError(f"Device function '{device_cfg['name']}' is async and requires a 'tcp' connection")
+        return ModbusSerialClient(
             port=modbus_cfg["port"],
             baudrate=modbus_cfg["baudrate"],
             timeout=modbus_cfg["timeout"],
@@ -68,33 +127,23 @@ try:
             parity=modbus_cfg["parity"],
         )
     elif modbus_cfg["type"].lower() == "tcp":
-        client = ModbusTcpClient(
+        client_class = AsyncModbusTcpClient if IS_ASYNC else ModbusTcpClient
+        return client_class(
             host=modbus_cfg["host"],
             port=modbus_cfg["port"],
             timeout=modbus_cfg["timeout"],
         )
     else:
         raise ValueError(f"Invalid connection type: {modbus_cfg['type']} (expected 'serial' or 'tcp')")
-except Exception as e:
-    logger.error(f"[main] Failed to initialize Modbus client: {e}")
-    sys.exit(1)
-
-# === Attempt connection ===
-if not client.connect():
-    logger.error("[main] Failed to connect to Modbus device. Will retry via systemd.")
-    sys.exit(1)
-
-logger.info("[main] Connected to Modbus device successfully.")
-
 
 
-# === Dynamically import device-specific function ===
-try:
-    device_module = importlib.import_module("utils.device_specific_func")
-    device_func = getattr(device_module, device_cfg["name"])
-except (ImportError, AttributeError):
-    logger.error(f"[main] Could not load device function '{device_cfg['name']}' from utils/device_specific_func.py")
-    sys.exit(1)
+client = None
+if not IS_ASYNC:
+    try:
+        client = build_client()
+    except Exception as e:
+        logger.error(f"[main] Failed to initialize Modbus client: {e}")
+        sys.exit(1)
 
 
 
@@ -102,26 +151,91 @@ except (ImportError, AttributeError):
 
 
 # === Main loop ===
-try:
-    while True:
+DISK_CHECK_EVERY = 30  # cycles between disk usage reports (~1/min at 2 s step)
+cycle = 0
 
-        # Rotate log daily
-        new_log_path = get_log_path(LOG_FOLDER)
-        set_log_file(new_log_path)
-        cleanup_old_logs(LOG_FOLDER, LOG_RETENTION_DAYS)
+# Purge logs from the old YYYY-MM-DD.log naming once at startup; the
+# rotating handler prunes its own .YYYY-MM-DD suffixed backups
+cleanup_old_logs(LOG_FOLDER, LOG_RETENTION_DAYS)
 
-        # Prepare CSV
-        CSV_FILE = get_csv_path_daily(base_folder = BASE_FOLDER, file_suffix = FILE_SUFFIX, header = HEADER)
 
-        # Show disk usage
+def prepare_cycle() -> str:
+    """Per-cycle housekeeping: disk report, CSV path. Returns the CSV path."""
+    global cycle
+
+    # Show disk usage (changes slowly, no need to statvfs every cycle)
+    if cycle % DISK_CHECK_EVERY == 0:
         show_disk_usage_bar("/")
         show_disk_usage_bar("/mnt/data_storage")
+    cycle += 1
+
+    # Prepare CSV (the SQLite sink ignores the path, so skip file creation)
+    if DB_FILE:
+        return DB_FILE
+    return get_csv_path_daily(base_folder = BASE_FOLDER, file_suffix = FILE_SUFFIX, header = HEADER)
+
+
+def enable_tcp_nodelay(sock) -> None:
+    """Disable Nagle's algorithm so small request PDUs go out immediately
+    instead of stalling ~40 ms waiting to coalesce with the previous ACK."""
+    try:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        logger.info("[main] TCP_NODELAY enabled on Modbus socket.")
+    except (AttributeError, OSError) as e:
+        logger.warning(f"[main] Could not set TCP_NODELAY: {e}")
+
+
+def tune_serial_client(serial_client, baudrate: int) -> None:
+    """Shorten pymodbus's serial receive-poll interval.
+
+    The serial reader sleeps `_recv_interval` between checks for response
+    bytes (4 character times by default). One character time is enough to
+    make progress, so responses complete a few milliseconds sooner on
+    every transaction — multiplied across an 8-device sweep every cycle.
+    """
+    if not hasattr(serial_client, "_recv_interval"):
+        return  # pymodbus internals changed; keep the library default
+    interval = max(0.001, 12.0 / baudrate)  # ~1 char time (12 bit times)
+    serial_client._recv_interval = interval
+    logger.info(f"[main] Serial receive-poll interval set to {interval * 1000:.2f} ms")
+
+
+def ensure_connected(c) -> bool:
+    """Reconnect the Modbus client if its link has dropped.
+
+    The client persists across poll cycles (no per-cycle handshake);
+    this only pays a connect when the socket/port actually went away,
+    e.g. after a device-side reset, instead of restarting the process.
+    """
+    if c.connected:
+        return True
+    logger.warning("[main] Modbus connection lost, reconnecting ...")
+    try:
+        return bool(c.connect())
+    except Exception as e:
+        logger.error(f"[main] Reconnect failed: {e}")
+        return False
+
+
+def main() -> None:
+    # === Attempt connection ===
+    if not client.connect():
+        logger.error("[main] Failed to connect to Modbus device. Will retry via systemd.")
+        sys.exit(1)
+
+    logger.info("[main] Connected to Modbus device successfully.")
+    if isinstance(client, ModbusTcpClient):
+        enable_tcp_nodelay(client.socket)
+    elif isinstance(client, ModbusSerialClient):
+        tune_serial_client(client, modbus_cfg["baudrate"])
 
-       
+    while True:
+        CSV_FILE = prepare_cycle()
 
-        # Read Modbus data
+        # Read Modbus data (reconnecting first if the link dropped)
         try:
-            device_func(client, START_ADDR, REG_COUNT, CSV_FILE, ID_RANGE)
+            if ensure_connected(client):
+                device_func(client, START_ADDR, REG_COUNT, CSV_FILE, ID_RANGE)
         except Exception as e:
             logger.error(f"[main] Error during Modbus read: {e}")
 
@@ -129,8 +243,58 @@ try:
         time.sleep(TIME_STEP)
 
 
+async def main_async() -> None:
+    global client
+    try:
+        client = build_client()
+    except Exception as e:
+        logger.error(f"[main] Failed to initialize Modbus client: {e}")
+        sys.exit(1)
+
+    try:
+        # === Attempt connection ===
+        if not await client.connect():
+            logger.error("[main] Failed to connect to Modbus device. Will retry via systemd.")
+            sys.exit(1)
+
+        logger.info("[main] Connected to Modbus device successfully.")
+        transport = getattr(client.ctx, "transport", None)
+        if transport is not None:
+            enable_tcp_nodelay(transport.get_extra_info("socket"))
+
+        while True:
+            CSV_FILE = prepare_cycle()
+
+            # Read Modbus data (reconnecting first if the link dropped)
+            try:
+                if client.connected or await client.connect():
+                    await device_func(client, START_ADDR, REG_COUNT, CSV_FILE, ID_RANGE)
+                else:
+                    logger.warning("[main] Modbus connection lost, reconnect failed; retrying next cycle.")
+            except Exception as e:
+                logger.error(f"[main] Error during Modbus read: {e}")
+
+            logger.info(f"[main] Waiting {TIME_STEP} seconds before next read cycle...")
+            await asyncio.sleep(TIME_STEP)
+    finally:
+        # Close while the event loop is still alive: the async client's
+        # close() schedules transport callbacks on the loop, which raises
+        # "Event loop is closed" if left to the module-level finally
+        # after asyncio.run() has torn the loop down
+        client.close()
+
+
+try:
+    if IS_ASYNC:
+        asyncio.run(main_async())
+    else:
+        main()
 except KeyboardInterrupt:
     logger.info("[main] 🛑 Stopped by user (Ctrl+C).")
 finally:
-    client.close()
+    device_module.csv_appender.close()
+    # The async client is closed inside main_async (its close() needs a
+    # live event loop); only the sync client is closed here
+    if not IS_ASYNC and client is not None:
+        client.close()
     logger.info("[main] ✅ Modbus client closed.")
\ No newline at end of file
@@ -1,11 +1,117 @@
 import os
+import re
 import shutil
 import csv
+import queue
 import logging
+import threading
 from datetime import datetime, timedelta
 
 
 
+# Per-process caches so the per-cycle CSV path lookup skips redundant
+# stat/mkdir syscalls once a file's header and folders are known to exist
+_HEADERED_PATHS = set()
+_ENSURED_DIRS = set()
+_DAILY_PATHS = {}  # (base_folder, file_suffix, day ordinal) -> csv_path
+
+
+class CsvAppender:
+    """
+    Keep one CSV file handle open across write calls instead of paying an
+    open()/close() syscall pair per row.
+
+    The handle is opened lazily on the first write and reopened only when the
+    target path changes (e.g. daily CSV rollover). Call close() at shutdown.
+
+    Rows are serialized with plain string joins rather than csv.writer:
+    device rows are numbers and fixed tokens (never embedded commas or
+    quotes), so the per-field quoting checks are pure overhead. None
+    becomes an empty field, matching csv.writer.
+    """
+
+    def __init__(self):
+        self.path = None
+        self._fh = None
+
+    def _ensure_open(self, path: str) -> None:
+        if path != self.path:
+            self.close()
+            # 64 KB buffer instead of line buffering: a whole poll-cycle
+            # batch accumulates in userspace and goes out as one write
+            # (the explicit flush per batch keeps rows durable per cycle)
+            self._fh = open(path, mode="a", newline="", buffering=65536)
+            self.path = path
+
+    @staticmethod
+    def _format(row: list) -> str:
+        return ",".join("" if v is None else str(v) for v in row) + "\n"
+
+    def writerow(self, path: str, row: list) -> None:
+        """Append one row to the CSV at `path`, reusing the open handle."""
+        self._ensure_open(path)
+        self._fh.write(self._format(row))
+        self._fh.flush()
+
+    def writerows(self, path: str, rows: list) -> None:
+        """Append a batch of rows in one bulk write, reusing the open handle."""
+        if not rows:
+            return
+        self._ensure_open(path)
+        self._fh.write("".join(self._format(row) for row in rows))
+        self._fh.flush()
+
+    def close(self) -> None:
+        """Close the current handle (if any); next write reopens."""
+        if self._fh is not None:
+            self._fh.close()
+        self._fh = None
+        self.path = None
+
+
+class ThreadedRowSink:
+    """
+    Run another row sink (CsvAppender, SqliteSink, ...) on a background thread.
+
+    The poll loop enqueues row batches in O(1) and goes straight back to the
+    Modbus bus; a daemon thread drains the queue through the wrapped sink, so
+    a stalled disk (slow SD card, busy fsync) never delays the next read.
+    close() flushes everything queued, joins the thread, and closes the sink.
+    """
+
+    _SENTINEL = object()
+
+    def __init__(self, sink, maxsize: int = 1024):
+        self._sink = sink
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def _drain(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is self._SENTINEL:
+                return
+            path, rows = item
+            try:
+                self._sink.writerows(path, rows)
+            except Exception as e:
+                logging.error(f"[csv] Background row writer failed: {e}")
+
+    def writerow(self, path: str, row: list) -> None:
+        self._queue.put((path, [row]))
+
+    def writerows(self, path: str, rows: list) -> None:
+        if rows:
+            self._queue.put((path, list(rows)))
+
+    def close(self) -> None:
+        """Flush queued rows, stop the thread, and close the wrapped sink."""
+        self._queue.put(self._SENTINEL)
+        self._thread.join(timeout=5)
+        self._sink.close()
+
+
 def get_csv_path_daily(base_folder: str, file_suffix: str, header: list) -> str:
     """
     Create and return the CSV path for the current day, organized as:
@@ -20,27 +126,48 @@ def get_csv_path_daily(base_folder: str, file_suffix: str, header: list) -> str:
         str: Full path to the CSV file.
     """
     now = datetime.now()
-    
-    # Folder hierarchy: data/YYYY/MM/
-    year_folder = os.path.join(base_folder, "data", now.strftime("%Y"))
-    month_folder = os.path.join(year_folder, now.strftime("%m"))
-    os.makedirs(month_folder, exist_ok=True)
+
+    # Memoize today's path: after the first call of the day this is a
+    # dict lookup with no strftime, path joins, or syscalls at all
+    memo_key = (base_folder, file_suffix, now.toordinal())
+    cached = _DAILY_PATHS.get(memo_key)
+    if cached is not None:
+        return cached
+
+    # Folder hierarchy: data/YYYY/MM/ (f-string integer formatting skips
+    # strftime's format parse + locale machinery)
+    year_folder = os.path.join(base_folder, "data", f"{now.year:04d}")
+    month_folder = os.path.join(year_folder, f"{now.month:02d}")
+    if month_folder not in _ENSURED_DIRS:
+        os.makedirs(month_folder, exist_ok=True)
+        _ENSURED_DIRS.add(month_folder)
 
     # Daily file name: YYYY-MM-DD_suffix.csv
-    day_name = now.strftime("%Y-%m-%d")
+    day_name = f"{now.year:04d}-{now.month:02d}-{now.day:02d}"
     csv_path = os.path.join(month_folder, f"{day_name}_{file_suffix}.csv")
 
-    # Create CSV file with header if needed
-    if not os.path.exists(csv_path) or os.path.getsize(csv_path) == 0:
-        with open(csv_path, mode="w", newline="") as f:
-            writer = csv.writer(f)
-            if header:  # allow empty list, don't fail
-                writer.writerow(header)
-        logging.info(f"[csv] Created new CSV file: {csv_path}")
-
+    # Create CSV file with header if needed. O_CREAT|O_EXCL is one
+    # syscall (vs. stat + open) and only writes the header if this call
+    # created the file, so a concurrent logger can never truncate data.
+    if csv_path not in _HEADERED_PATHS:
+        try:
+            fd = os.open(csv_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            with os.fdopen(fd, "w", newline="") as f:
+                if header:  # allow empty list, don't fail
+                    csv.writer(f).writerow(header)
+            logging.info(f"[csv] Created new CSV file: {csv_path}")
+        except FileExistsError:
+            pass
+        _HEADERED_PATHS.add(csv_path)
+
+    _DAILY_PATHS[memo_key] = csv_path
     return csv_path
 
 
+# Matches the legacy daily log naming (YYYY-MM-DD.log)
+_LOG_NAME_RE = re.compile(r"\d{4}-\d{2}-\d{2}\.log")
+
+
 def cleanup_old_logs(log_folder: str, log_retention_days: int) -> None:
     """
     Delete .log files in `log_folder` older than `log_retention_days`.
@@ -49,24 +176,31 @@ def cleanup_old_logs(log_folder: str, log_retention_days: int) -> None:
         logging.warning(f"[log] Log folder '{log_folder}' not found.")
         return
 
-    cutoff = datetime.now() - timedelta(days=log_retention_days)
+    # ISO dates compare lexicographically, so a plain string compare
+    # against the cutoff replaces a strptime parse per file
+    cutoff_str = (datetime.now() - timedelta(days=log_retention_days)).strftime("%Y-%m-%d")
     deleted_count = 0
 
-    for fname in os.listdir(log_folder):
-        if not fname.endswith(".log"):
-            continue
-
-        fpath = os.path.join(log_folder, fname)
-        try:
-            # Expect file format: YYYY-MM-DD.log
-            fdate = datetime.strptime(fname[:-4], "%Y-%m-%d")
-
-            if fdate < cutoff:
-                os.remove(fpath)
-                logging.info(f"[log] Deleted old log: {fname}")
-                deleted_count += 1
-        except ValueError:
-            continue
+    # Hold the directory open and unlink by name relative to its fd, so
+    # the kernel resolves the folder path once instead of once per file
+    dir_fd = os.open(log_folder, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+    try:
+        # scandir yields entries lazily with the file type cached from the
+        # directory read, so no per-file stat and no intermediate list
+        with os.scandir(log_folder) as entries:
+            for entry in entries:
+                fname = entry.name
+                # Expect file format: YYYY-MM-DD.log (one compiled-regex
+                # match instead of suffix + positional dash checks)
+                if not _LOG_NAME_RE.fullmatch(fname) or not entry.is_file():
+                    continue
+
+                if fname[:10] < cutoff_str:
+                    os.unlink(fname, dir_fd=dir_fd)
+                    logging.info(f"[log] Deleted old log: {fname}")
+                    deleted_count += 1
+    finally:
+        os.close(dir_fd)
 
     if deleted_count == 0:
         logging.info("[log] No old log files found to delete.")
@@ -75,30 +209,12 @@ def cleanup_old_logs(log_folder: str, log_retention_days: int) -> None:
 
 
 
-def set_log_file(new_log_path: str) -> None:
-    """Switch logging output to a new file."""
-    root_logger = logging.getLogger()
-
-    # 1️⃣ Remove old FileHandlers
-    for handler in root_logger.handlers[:]:
-        if isinstance(handler, logging.FileHandler):
-            root_logger.removeHandler(handler)
-            handler.close()  # close old file
-
-    # 2️⃣ Add new FileHandler
-    new_handler = logging.FileHandler(new_log_path, mode="a")
-    new_handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
-    root_logger.addHandler(new_handler)
-
-
-
-
-def get_log_path(log_folder: str) -> str:
-    """Return today's log file path, ensuring folder exists."""
-    os.makedirs(log_folder, exist_ok=True)
-    return os.path.join(log_folder, f"{datetime.now().strftime('%Y-%m-%d')}.log")
-
 
+# Bar templates sliced per report instead of rebuilding the strings
+# with multiplication + concat on every call
+_BAR_MAX = 40
+_FULL_BAR = "█" * _BAR_MAX
+_EMPTY_BAR = "-" * _BAR_MAX
 
 
 def show_disk_usage_bar(path: str = "/", bar_length: int = 40) -> None:
@@ -115,11 +231,14 @@ def show_disk_usage_bar(path: str = "/", bar_length: int = 40) -> None:
 
     used_percent = used / total if total > 0 else 0
     used_blocks = int(bar_length * used_percent)
-    free_blocks = bar_length - used_blocks
 
-    bar = "█" * used_blocks + "-" * free_blocks
-    logging.info(f"[disk] Path: {path}")
+    if bar_length <= _BAR_MAX:
+        bar = _FULL_BAR[:used_blocks] + _EMPTY_BAR[used_blocks:bar_length]
+    else:
+        bar = "█" * used_blocks + "-" * (bar_length - used_blocks)
+    # One record for the whole report: a single format + handler dispatch
     logging.info(
+        f"[disk] Path: {path}\n"
         f"[disk] [{bar}] {used_percent*100:.1f}% "
         f"Total: {total / (1024**3):.2f} GB | Used: {used / (1024**3):.2f} GB | Free: {free / (1024**3):.2f} GB"
     )
\ No newline at end of file
@@ -1,40 +1,159 @@
 import struct
-import csv
 import logging
+import random
 import time
-import sys
+import asyncio
 from datetime import datetime
 from pymodbus.client import ModbusSerialClient, ModbusTcpClient
+from utils.common_utils import CsvAppender
 
 logger = logging.getLogger(__name__)
 
+# Shared CSV handle, opened once and reused across poll cycles.
+# modbus_logger.py closes it in its final cleanup.
+csv_appender = CsvAppender()
+
+# Precompiled struct formats for the DCM3366 decode (registers are
+# big-endian 16-bit; value pairs combine into unsigned 32-bit)
+_DCM_PACK_26H = struct.Struct(">26H")
+_DCM_U32 = struct.Struct(">I")
+_DCM_U32X3 = struct.Struct(">III")
+
+# Precompiled struct formats for the TP-700 decode (48 big-endian
+# 16-bit registers reinterpret as 24 big-endian float32 channels)
+_TP700_PACK_48H = struct.Struct(">48H")
+_TP700_UNPACK_24F = struct.Struct(">24f")
+
+
+# Monotonic timestamp of the last Modbus frame sent via _pace()
+_last_frame = 0.0
+
+# Per-device circuit breaker (keyed by Modbus unit id). A failing
+# device is skipped for a growing, jittered cooldown instead of killing
+# the process — one dead meter must not stop logging for the rest of
+# the bus, and systemd restart storms retry in lockstep.
+_fail_counts = {}
+_next_attempt_ts = {}
+
+
+def _breaker_open(unit_id: int) -> bool:
+    """True while `unit_id` is still cooling down after failures."""
+    return time.monotonic() < _next_attempt_ts.get(unit_id, 0.0)
+
+
+def _breaker_trip(unit_id: int) -> None:
+    """Record a failure and push the device's next attempt out (max 60 s)."""
+    count = _fail_counts.get(unit_id, 0) + 1
+    _fail_counts[unit_id] = count
+    cooldown = min(60.0, 2.0 ** count) * random.uniform(0.8, 1.2)
+    _next_attempt_ts[unit_id] = time.monotonic() + cooldown
+
+
+def _breaker_reset(unit_id: int) -> None:
+    """Clear breaker state after a successful read."""
+    if _fail_counts.pop(unit_id, None) is not None:
+        _next_attempt_ts.pop(unit_id, None)
+
+
+def _pace(min_gap: float = 0.02) -> None:
+    """
+    Enforce a minimum gap since the previous Modbus frame.
+
+    Sleeps only for whatever is left of `min_gap` (device inter-frame
+    tolerance, typically well under 20 ms) instead of a fixed pause, so
+    time already spent parsing or logging counts toward the gap.
+    """
+    global _last_frame
+    remaining = min_gap - (time.monotonic() - _last_frame)
+    if remaining > 0:
+        time.sleep(remaining)
+    _last_frame = time.monotonic()
+
+
+def _flush_serial_input(client) -> None:
+    """
+    Drop stale bytes from the serial input buffer before a transaction.
+
+    Leftover bytes from a timed-out or corrupted response would otherwise
+    be parsed as the start of the next reply and fail the read, sending
+    the caller down its (much more expensive) error path.
+    """
+    reset = getattr(getattr(client, "socket", None), "reset_input_buffer", None)
+    if reset is not None:
+        try:
+            reset()
+        except Exception:
+            pass  # a failed flush just falls back to the old behavior
+
 
 
 def list_regis(client: ModbusSerialClient, start_addr: int, reg_count: int, csv_file: str, device_range: range) -> None:
     """List and optionally save Modbus holding registers for one or more devices."""
     for unit_id in device_range:
-        logger.info(f"[list_regis] Listing registers for device with Modbus ID = {unit_id} ...")
+        logger.info("[list_regis] Listing registers for device with Modbus ID = %s ...", unit_id)
 
         try:
             response = client.read_holding_registers(address=start_addr, count=reg_count, device_id=unit_id)
-            if not response or getattr(response, "isError", lambda: True)():
-                logger.warning(f"[list_regis] No valid response from device {unit_id}")
+            if not response or response.isError():
+                logger.warning("[list_regis] No valid response from device %s", unit_id)
                 continue
 
             regs = response.registers
             if not regs:
-                logger.warning(f"[list_regis] Incomplete response from device {unit_id}")
+                logger.warning("[list_regis] Incomplete response from device %s", unit_id)
                 continue
 
-            logger.info(f"[list_regis] Raw registers ({len(regs)}):")
-
+            # Register listing is this tool's output, so it stays at INFO —
+            # but build it as one record instead of one per 10 registers
             chunk_size = 10  # how many registers per line
+            parts = [f"[list_regis] Raw registers ({len(regs)}):"]
             for i in range(0, len(regs), chunk_size):
                 chunk = regs[i:i + chunk_size]
-                logger.info("[list_regis] [" + ", ".join(f"{r}" for r in chunk) + "]")
+                parts.append("[list_regis] [" + ", ".join(map(str, chunk)) + "]")
+            logger.info("\n".join(parts))
 
         except Exception as e:
-            logger.error(f"[list_regis] Exception reading device {unit_id}: {e}")
+            logger.error("[list_regis] Exception reading device %s: %s", unit_id, e)
+
+
+async def list_regis_async(client, start_addr: int, reg_count: int, csv_file: str, device_range: range) -> None:
+    """
+    List Modbus holding registers for several devices over async TCP.
+
+    Issues one read per device ID and gathers the results. pymodbus
+    serializes transactions on a shared client behind an internal lock,
+    so this buys uniform error fan-in rather than wire overlap. TCP
+    only (an RTU serial bus is half duplex); modbus_logger selects this
+    variant via the "name" field in the device config.
+    """
+    logger.info("[list_regis] Listing registers for %s devices ...", len(device_range))
+    responses = await asyncio.gather(
+        *(
+            client.read_holding_registers(address=start_addr, count=reg_count, device_id=unit_id)
+            for unit_id in device_range
+        ),
+        return_exceptions=True,
+    )
+
+    for unit_id, response in zip(device_range, responses):
+        if isinstance(response, Exception):
+            logger.error("[list_regis] Exception reading device %s: %s", unit_id, response)
+            continue
+        if not response or response.isError():
+            logger.warning("[list_regis] No valid response from device %s", unit_id)
+            continue
+
+        regs = response.registers
+        if not regs:
+            logger.warning("[list_regis] Incomplete response from device %s", unit_id)
+            continue
+
+        chunk_size = 10  # how many registers per line
+        parts = [f"[list_regis] Device {unit_id} raw registers ({len(regs)}):"]
+        for i in range(0, len(regs), chunk_size):
+            chunk = regs[i:i + chunk_size]
+            parts.append("[list_regis] [" + ", ".join(map(str, chunk)) + "]")
+        logger.info("\n".join(parts))
 
 
 
@@ -44,10 +163,14 @@ def hoymiles_dtu_p(client: ModbusTcpClient, start_addr: int, reg_count: int,
     regs = []
 
     for i in device_range:
-        logger.info(f"[hoymiles_dtu_p] Collecting registers for device {i} ...")
-        time.sleep(0.2)  # brief pause between devices
-
-        max_retries = 10
+        logger.info("[hoymiles_dtu_p] Collecting registers for device %s ...", i)
+        _pace()  # enforce the inter-frame gap without a fixed 0.2 s stall
+
+        # Bounded retries with jittered exponential backoff: constant
+        # 2 s sleeps in lockstep would stall the whole sweep for minutes
+        # and retry in sync with every other restarted logger
+        max_retries = 3
+        base, cap = 0.2, 5.0
         attempt = 0
         success = False
 
@@ -62,93 +185,143 @@ def hoymiles_dtu_p(client: ModbusTcpClient, start_addr: int, reg_count: int,
                 # Validate response
                 if not response or response.isError():
                     attempt += 1
-                    logger.warning(f"[hoymiles_dtu_p] Attempt {attempt}/{max_retries} failed for device {i}, retrying...")
-                    time.sleep(2)
+                    logger.warning("[hoymiles_dtu_p] Attempt %s/%s failed for device %s, retrying...", attempt, max_retries, i)
+                    time.sleep(random.uniform(0, min(cap, base * (2 ** attempt))))
                     continue
 
                 # Got valid data
-                regs.append(response.registers + [datetime.now().strftime("%Y-%m-%dT%H:%M:%S")])
+                regs.append(response.registers + [datetime.now().isoformat(timespec="seconds")])
                 success = True
                 break  # stop retrying, move to next device
 
             except Exception as e:
                 attempt += 1
-                logger.error(f"[hoymiles_dtu_p] Exception on attempt {attempt}/{max_retries} for device {i}: {e}")
-                time.sleep(2)
+                logger.error("[hoymiles_dtu_p] Exception on attempt %s/%s for device %s: %s", attempt, max_retries, i, e)
+                time.sleep(random.uniform(0, min(cap, base * (2 ** attempt))))
 
         if not success:
-            logger.critical(f"[hoymiles_dtu_p] Failed to read device {i} after {max_retries} attempts. Shutting down system...")
-            client.close()  # Close connection cleanly
-            sys.exit(1)     # Exit the entire program
+            # Skip this device for the current poll instead of killing the
+            # process; healthy devices on the same DTU keep logging
+            logger.error("[hoymiles_dtu_p] Failed to read device %s after %s attempts; skipping this poll.", i, max_retries)
+            regs.append(None)
 
     # --- Parse and log data ---
     for i in device_range:
-        try:
-            data = regs[i - 1]
+        if regs[i - 1] is None:
+            continue
+        _hoymiles_parse_one(i, regs, csv_file)
+
+
+def _hoymiles_parse_one(i: int, regs: list, csv_file: str) -> None:
+    """Parse, log, and write the record collected for Hoymiles device `i`."""
+    try:
+        data = regs[i - 1]
+
+        if not isinstance(data, list) or len(data) < 41:
+            logger.error("[hoymiles_dtu_p] Invalid data length for device %s: %s", i, len(data))
+            return
+
+        now = data[-1]  # timestamp
+        # One pack call for all three registers instead of a
+        # per-register pack + join of intermediate bytes objects
+        serial_number = struct.pack('>3H', *data[0:3]).hex()
+        total_prod = (data[3] << 16) + data[4]
+        today_prod = (data[5] << 16) + data[6]
+        # Registers are always ints here (pymodbus decodes them), so the
+        # scaling is inlined: multiplying by the reciprocal skips both a
+        # function call and an isinstance check per field
+        temp = round(data[20] * 0.1, 2)
+
+        # PV1–PV4 values as three fixed lists — no dict inserts or
+        # per-field key formatting, and the CSV row unpacks them directly
+        PV_V = [round(data[21 + n * 3] * 0.1, 2) for n in range(4)]
+        PV_I = [round(data[22 + n * 3] * 0.01, 2) for n in range(4)]
+        PV_P = [round(data[23 + n * 3] * 0.1, 2) for n in range(4)]
+
+        operating_status = data[39] if len(data) > 39 else None
+        Error = "No error"
 
-            if not isinstance(data, list) or len(data) < 41:
-                logger.error(f"[hoymiles_dtu_p] Invalid data length for device {i}: {len(data)}")
-                continue
+        # --- Logging values ---
+        logger.info("[hoymiles_dtu_p] Datetime         : %s", now)
+        logger.info("[hoymiles_dtu_p] Serial Number    : %s", serial_number)
+        logger.info("[hoymiles_dtu_p] Total Prod [Wh]  : %s", total_prod)
+        logger.info("[hoymiles_dtu_p] Today Prod [Wh]  : %s", today_prod)
+        logger.info("[hoymiles_dtu_p] Temp [°C]        : %s", temp)
+        logger.info("[hoymiles_dtu_p] PV Voltage [V]   : %s", ", ".join(map(str, PV_V)))
+        logger.info("[hoymiles_dtu_p] PV Current [A]   : %s", ", ".join(map(str, PV_I)))
+        logger.info("[hoymiles_dtu_p] PV Power   [W]   : %s", ", ".join(map(str, PV_P)))
+        logger.info("[hoymiles_dtu_p] Operating Status : %s", operating_status)
+
+        # --- Write to CSV (shared persistent handle) ---
+        csv_appender.writerow(csv_file, [
+            now, serial_number,
+            round(total_prod, 1),
+            round(today_prod, 1),
+            temp,
+            *PV_V,
+            *PV_I,
+            *PV_P,
+            operating_status,
+            Error
+        ])
+
+    except IndexError as e:
+        logger.error("[hoymiles_dtu_p] Index error while parsing data: %s", e)
+    except Exception as e:
+        logger.error("[hoymiles_dtu_p] Unexpected error during parsing: %s", e)
+
+
+async def hoymiles_dtu_p_async(client, start_addr: int, reg_count: int,
+                               csv_file: str, device_range: range) -> None:
+    """
+    Read all Hoymiles DTU-Pro device windows over async Modbus TCP.
+
+    Issues one read per device window and gathers the results. pymodbus
+    serializes transactions on a shared client behind an internal lock,
+    so the reads still go out one at a time — the gather buys uniform
+    error fan-in (exceptions, error PDUs, and timeouts all land in one
+    result list), not wire overlap. Failed devices are logged and
+    skipped; parsing and CSV output are shared with the sync variant.
+    """
+    now = datetime.now().isoformat(timespec="seconds")
+
+    logger.info("[hoymiles_dtu_p] Collecting registers for %s devices ...", len(device_range))
+    responses = await asyncio.gather(
+        *(
+            client.read_input_registers(address=start_addr + 96 * (i - 1), count=reg_count, device_id=1)
+            for i in device_range
+        ),
+        return_exceptions=True,
+    )
 
-            # Helper for safe division
-            def safe_div(value, divisor):
-                return round(value / divisor, 2) if isinstance(value, (int, float)) else None
-
-            now = data[-1]  # timestamp
-            serial_number = b''.join(struct.pack('>H', r) for r in data[0:3]).hex()
-            total_prod = (data[3] << 16) + data[4]
-            today_prod = (data[5] << 16) + data[6]
-            temp = safe_div(data[20], 10)
-
-            # PV1–PV4 values
-            PV = {}
-            for n in range(4):
-                base = 21 + n * 3
-                PV[f"V{n+1}"] = safe_div(data[base], 10)
-                PV[f"I{n+1}"] = safe_div(data[base + 1], 100)
-                PV[f"P{n+1}"] = safe_div(data[base + 2], 10)
-
-            operating_status = data[39] if len(data) > 39 else None
-            Error = "No error"
-
-            # --- Logging values ---
-            logger.info(f"[hoymiles_dtu_p] Datetime         : {now}")
-            logger.info(f"[hoymiles_dtu_p] Serial Number    : {serial_number}")
-            logger.info(f"[hoymiles_dtu_p] Total Prod [Wh]  : {total_prod}")
-            logger.info(f"[hoymiles_dtu_p] Today Prod [Wh]  : {today_prod}")
-            logger.info(f"[hoymiles_dtu_p] Temp [°C]        : {temp}")
-            logger.info(f"[hoymiles_dtu_p] PV Voltage [V]   : {', '.join(str(PV[f'V{n+1}']) for n in range(4))}")
-            logger.info(f"[hoymiles_dtu_p] PV Current [A]   : {', '.join(str(PV[f'I{n+1}']) for n in range(4))}")
-            logger.info(f"[hoymiles_dtu_p] PV Power   [W]   : {', '.join(str(PV[f'P{n+1}']) for n in range(4))}")
-            logger.info(f"[hoymiles_dtu_p] Operating Status : {operating_status}")
-
-            # --- Write to CSV ---
-            with open(csv_file, mode="a", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    now, serial_number,
-                    round(total_prod, 1),
-                    round(today_prod, 1),
-                    temp,
-                    *(PV[f"V{n+1}"] for n in range(4)),
-                    *(PV[f"I{n+1}"] for n in range(4)),
-                    *(PV[f"P{n+1}"] for n in range(4)),
-                    operating_status,
-                    Error
-                ])
-
-        except IndexError as e:
-            logger.error(f"[hoymiles_dtu_p] Index error while parsing data: {e}")
-        except Exception as e:
-            logger.error(f"[hoymiles_dtu_p] Unexpected error during parsing: {e}")
+    regs = []
+    for i, response in zip(device_range, responses):
+        if isinstance(response, Exception) or not response or response.isError():
+            logger.error("[hoymiles_dtu_p] Failed to read device %s: %s", i, response)
+            regs.append(None)
+        else:
+            regs.append(response.registers + [now])
+
+    for i in device_range:
+        if regs[i - 1] is None:
+            continue
+        _hoymiles_parse_one(i, regs, csv_file)
 
 
 
 def tp_700(client: ModbusSerialClient, start_addr: int, reg_count: int, csv_file: str, device_range: range) -> None:
+    pending = []  # rows collected over the sweep, written in one batch
+    now = datetime.now().isoformat(timespec="seconds")  # one timestamp per sweep
+
     for unit_id in device_range:
-        logger.info(f"[tp_700] Reading temperature data logger (TP-700) with Modbus ID = {unit_id} ...")
+        if _breaker_open(unit_id):
+            logger.warning("[tp_700] Skipping device %s (circuit open after repeated failures)", unit_id)
+            continue
+
+        logger.info("[tp_700] Reading temperature data logger (TP-700) with Modbus ID = %s ...", unit_id)
 
         try:
+            _flush_serial_input(client)
             response = client.read_holding_registers(address=start_addr,count=reg_count,device_id=unit_id)
 
             # --- Validate response ---
@@ -160,251 +333,244 @@ def tp_700(client: ModbusSerialClient, start_addr: int, reg_count: int, csv_file
                 raise ValueError(f"Incomplete response from device {unit_id}")
 
         except Exception as e:
-            # Record error with None values, then exit
-            now = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
-            logger.error(f"[tp_700] Error reading device {unit_id}: {e}")
-            temps = [None] * 24
-            Error = "Error"
-
-            logger.info(f"[tp_700] Datetime: {now}")
-            for i in range(0, len(temps), 6):
-                row = temps[i:i + 6]
-                logger.info("[tp_700] " + "  ".join(f"CH{i+j+1:02d}: {t}" for j, t in enumerate(row)))
-
-            # Write record before exit
-            with open(csv_file, mode="a", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow([now, unit_id] + temps + [Error])
-
-            # Close client and exit system
-            client.close()
-            sys.exit(1)
+            # Record the error row and open the breaker for this device;
+            # the rest of the bus keeps logging
+            logger.error("[tp_700] Error reading device %s: %s", unit_id, e)
+            pending.append([now, unit_id] + [None] * 24 + ["Error"])
+            _breaker_trip(unit_id)
+            continue
 
         # --- Log raw registers ---
-        logger.info(f"[tp_700] Raw registers ({len(regs)}):")
-        chunk_size = 10
-        for i in range(0, len(regs), chunk_size):
-            chunk = regs[i:i + chunk_size]
-            logger.info("[tp_700] [" + ", ".join(f"{r}" for r in chunk) + "]")
+        # Raw dumps are debug-level and %-style lazy: nothing is
+        # formatted at all unless a handler actually wants DEBUG
+        logger.debug("[tp_700] Raw registers (%d): %s", len(regs), regs)
 
         # --- Decode 24 temperature channels (big endian) ---
         try:
-            temps = []
-            for i in range(0, reg_count, 2):
-                high = regs[i]
-                low = regs[i + 1]
-                bytes_be = struct.pack('>HH', high, low)
-                temp_c = struct.unpack('>f', bytes_be)[0]
-                temps.append(temp_c)
+            # One C-level reinterpretation of the whole register block
+            # instead of per-channel struct.pack/struct.unpack round-trips
+            temps = _TP700_UNPACK_24F.unpack(_TP700_PACK_48H.pack(*regs[:48]))
         except Exception as e:
-            # If decode fails, log and exit after recording None
-            now = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
-            logger.critical(f"[tp_700] Error decoding data for device {unit_id}: {e}")
-            temps = [None] * 24
-            Error = "Decode error"
-
-            with open(csv_file, mode="a", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow([now, unit_id] + temps + [Error])
+            # Record the decode failure and move on; a corrupt frame from
+            # one device is no reason to drop the whole sweep
+            logger.error("[tp_700] Error decoding data for device %s: %s", unit_id, e)
+            pending.append([now, unit_id] + [None] * 24 + ["Decode error"])
+            _breaker_trip(unit_id)
+            continue
 
-            client.close()
-            sys.exit(1)
+        _breaker_reset(unit_id)
 
         # --- Normal operation ---
-        now = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
-        Error = "No error"
-        logger.info(f"[tp_700] Datetime: {now}")
-        for i in range(0, len(temps), 6):
-            row = temps[i:i + 6]
-            logger.info("[tp_700] " + "  ".join(f"CH{i+j+1:02d}: {t:.2f} °C" for j, t in enumerate(row)))
+        # Format each channel exactly once; the strings feed both the
+        # (single multi-line) log record and the CSV row
+        temp_strs = [f"{t:.2f}" for t in temps]
+        parts = [f"[tp_700] Datetime: {now}"]
+        for i in range(0, len(temp_strs), 6):
+            row = temp_strs[i:i + 6]
+            parts.append("[tp_700] " + "  ".join(f"CH{i+j+1:02d}: {s} °C" for j, s in enumerate(row)))
+        logger.info("\n".join(parts))
 
-        # --- Write to CSV ---
-        try:
-            with open(csv_file, mode="a", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow([now, unit_id] + [round(t, 2) for t in temps] + [Error])
-        except Exception as e:
-            logger.critical(f"[tp_700] Failed to write to CSV: {e}")
-            client.close()
-            sys.exit(1)
+        pending.append([now, unit_id] + temp_strs + ["No error"])
+
+    # --- Write the whole sweep to CSV in one batch ---
+    try:
+        csv_appender.writerows(csv_file, pending)
+    except Exception as e:
+        # Stay up: the sweep's rows are lost but the next poll retries.
+        # Never close the sink here — it is the shared ThreadedRowSink,
+        # and closing it would stop the drain thread for good; the
+        # wrapped sink recovers by reopening on its own.
+        logger.critical("[tp_700] Failed to write to CSV: %s", e)
 
 
 
 def dcm_3366(client: ModbusSerialClient, start_addr: int, reg_count: int, csv_file: str, device_range: range) -> None:
     """Read DC meter (DCM3366) and save readings."""
+    pending = []  # rows collected over the sweep, written in one batch
+    now = datetime.now().isoformat()  # one timestamp shared by the whole sweep
+
     for device_id in device_range:
-        logger.info(f"[dcm_3366] Reading DC meter (DCM3366) with Modbus ID = {device_id} ...")
+        if _breaker_open(device_id):
+            logger.warning("[dcm_3366] Skipping device %s (circuit open after repeated failures)", device_id)
+            continue
+
+        logger.info("[dcm_3366] Reading DC meter (DCM3366) with Modbus ID = %s ...", device_id)
 
         try:
+            _flush_serial_input(client)
             response = client.read_holding_registers(
                 address=start_addr, count=reg_count, device_id=device_id
             )
-        except Exception as e:
-            logger.info(f"[dcm_3366] Exception reading device {device_id}: {e}")
-            Forward_energy = Active_power = Current = Voltage = None
-            Error = "Error"
-            now = datetime.now().isoformat()
-
-            logger.info(f"[dcm_3366] Datetime: {now}")
-            logger.info(f"[dcm_3366] Forward energy (kWh): {Forward_energy}")
-            logger.info(f"[dcm_3366] Active power (kW): {Active_power}")
-            logger.info(f"[dcm_3366] Current (A): {Current}")
-            logger.info(f"[dcm_3366] Voltage (V): {Voltage}")
-
-            # Append to CSV with None values
-            with open(csv_file, mode="a", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow([now, device_id, Forward_energy, Active_power, Current, Voltage, Error])
-
-            # Cleanly close client before exit
-            try:
-                if client.is_socket_open():
-                    client.close()
-                    logger.info("[dcm_3366] Modbus client closed due to error.")
-            except Exception as close_err:
-                logger.info(f"[dcm_3366] Error while closing client: {close_err}")
 
-            logger.info("[dcm_3366] Exiting system due to critical read error.")
-            sys.exit(1)
-
-        # === Decode normal data ===
-        regs = response.registers
-        logger.info(f"[dcm_3366] Raw registers ({len(regs)}):")
-
-        chunk_size = 20
-        for i in range(0, len(regs), chunk_size):
-            chunk = regs[i:i + chunk_size]
-            logger.info("[dcm_3366] [" + ", ".join(f"{r}" for r in chunk) + "]")
-
-        Forward_energy = (regs[0] << 16) + regs[1]
-        Active_power = (regs[20] << 16) + regs[21]
-        Current = (regs[22] << 16) + regs[23]
-        Voltage = (regs[24] << 16) + regs[25]
-        Error = "No error"
-        now = datetime.now().isoformat()
+            # --- Validate response ---
+            # An exception-response PDU (e.g. a gateway reporting one
+            # offline meter) is a valid reply with no registers
+            if not response or response.isError():
+                raise ValueError(f"Invalid or no Modbus response from device {device_id}")
 
-        logger.info(f"[dcm_3366] Datetime: {now}")
-        logger.info(f"[dcm_3366] Forward energy (kWh): {Forward_energy / 100:.3f}")
-        logger.info(f"[dcm_3366] Active power (kW): {Active_power / 1000:.3f}")
-        logger.info(f"[dcm_3366] Current (A): {Current / 10000:.3f}")
-        logger.info(f"[dcm_3366] Voltage (V): {Voltage / 10000:.1f}")
-
-        with open(csv_file, mode="a", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                now,
-                device_id,
-                round(Forward_energy / 100, 3),
-                round(Active_power / 1000, 3),
-                round(Current / 10000, 3),
-                round(Voltage / 10000, 1),
-                Error
-            ])
+            regs = response.registers
+            if len(regs) < 26:  # decode unpacks the first 26 registers
+                raise ValueError(f"Incomplete response from device {device_id}")
 
+        except Exception as e:
+            # Record the error row and open the breaker for this meter;
+            # the other meters on the bus keep logging
+            logger.error("[dcm_3366] Error reading device %s: %s", device_id, e)
+            pending.append([now, device_id, None, None, None, None, "Error"])
+            _breaker_trip(device_id)
+            continue
 
+        # === Decode normal data ===
+        try:
+            row = _dcm_3366_row(now, device_id, regs)
+        except Exception as e:
+            # Record the decode failure and move on; a corrupt frame from
+            # one meter is no reason to drop the whole sweep
+            logger.error("[dcm_3366] Error decoding data for device %s: %s", device_id, e)
+            pending.append([now, device_id, None, None, None, None, "Decode error"])
+            _breaker_trip(device_id)
+            continue
+
+        _breaker_reset(device_id)
+        pending.append(row)
+
+    # --- Write the whole sweep to CSV in one batch ---
+    csv_appender.writerows(csv_file, pending)
+
+
+def _dcm_3366_row(now: str, device_id: int, regs: list) -> list:
+    """Decode and log one DCM3366 reading, returning its CSV row."""
+    logger.debug("[dcm_3366] Raw registers (%d): %s", len(regs), regs)
+
+    # Assemble the 32-bit values in C via struct instead of
+    # per-register shift-and-add (offsets in bytes = register index * 2)
+    buf = _DCM_PACK_26H.pack(*regs[:26])
+    Forward_energy, = _DCM_U32.unpack_from(buf, 0)
+    Active_power, Current, Voltage = _DCM_U32X3.unpack_from(buf, 40)
+    Error = "No error"
+
+    # One record per device; the scaled values are computed only here
+    # (the CSV row keeps the raw fixed-point integers)
+    logger.info(
+        f"[dcm_3366] Datetime: {now}\n"
+        f"[dcm_3366] Forward energy (kWh): {Forward_energy / 100:.3f}\n"
+        f"[dcm_3366] Active power (kW): {Active_power / 1000:.3f}\n"
+        f"[dcm_3366] Current (A): {Current / 10000:.3f}\n"
+        f"[dcm_3366] Voltage (V): {Voltage / 10000:.1f}"
+    )
+
+    # Store the raw fixed-point device units (see the _x100/_x1000/_x10000
+    # column names in the config header): integer fields skip the float
+    # divide + format entirely, post-processing divides on read
+    return [now, device_id, Forward_energy, Active_power, Current, Voltage, Error]
+
+
+async def dcm_3366_async(client, start_addr: int, reg_count: int, csv_file: str, device_range: range) -> None:
+    """
+    Read all DCM3366 meters over async Modbus TCP.
+
+    Issues one read per device ID and gathers the results. pymodbus
+    serializes transactions on a shared client behind an internal lock,
+    so this buys uniform error fan-in rather than wire overlap. TCP
+    only (an RTU serial bus is half duplex); modbus_logger selects this
+    variant via the "name" field in the device config.
+    """
+    pending = []  # rows collected over the sweep, written in one batch
+    now = datetime.now().isoformat()  # one timestamp shared by the whole sweep
+
+    logger.info("[dcm_3366] Reading %s DC meters (DCM3366) ...", len(device_range))
+    responses = await asyncio.gather(
+        *(
+            client.read_holding_registers(address=start_addr, count=reg_count, device_id=device_id)
+            for device_id in device_range
+        ),
+        return_exceptions=True,
+    )
+
+    for device_id, response in zip(device_range, responses):
+        if (isinstance(response, Exception) or not response or response.isError()
+                or len(response.registers) < 26):
+            logger.error("[dcm_3366] Failed to read device %s: %s", device_id, response)
+            pending.append([now, device_id, None, None, None, None, "Error"])
+            continue
+
+        pending.append(_dcm_3366_row(now, device_id, response.registers))
+
+    csv_appender.writerows(csv_file, pending)
+
+
+
+
+# Weather station register map: (field, register index, scale divisor,
+# unit label, CSV rounding digits). Register indices follow the XML
+# <Point> tag definitions. Adding a field is one row here — the decode
+# loop, log line, and CSV row all derive from this table.
+_WEATHER_FIELDS = (
+    ("GHI", 0, 1, "W/m^2", 2),            # 40015
+    ("DHI", 1, 1, "W/m^2", 2),            # 40016
+    ("DNI", 2, 1, "W/m^2", 2),            # 40017
+    ("GTI", 3, 1, "W/m^2", 2),            # 40018
+    ("WindDir", 7, 1, "deg", 1),          # 40022
+    ("WindSpeed", 8, 10, "", 2),          # 40023
+    ("WindSpeed_2", 9, 10, "", 2),        # 40024
+    ("WindSpeed_10", 10, 10, "", 2),      # 40025
+    ("AirTemp", 30, 10, "deg_C", 1),      # 40045
+    ("Humidity", 37, 10, "%", 1),         # 40052
+    ("AirPres", 43, 10, "hPa", 1),        # 40058
+)
 
 
 def custom_weather(client: ModbusSerialClient, start_addr: int, reg_count: int, csv_file: str, device_range: range) -> None:
     """Read weather station data and save readings."""
     for device_id in device_range:
-        logger.info(f"[custom_weather] Reading Weather Station with Modbus ID = {device_id} ...")
+        if _breaker_open(device_id):
+            logger.warning("[custom_weather] Skipping device %s (circuit open after repeated failures)", device_id)
+            continue
+
+        logger.info("[custom_weather] Reading Weather Station with Modbus ID = %s ...", device_id)
 
         try:
             response = client.read_holding_registers(
                 address=start_addr, count=reg_count, device_id=device_id
             )
-        except Exception as e:
-            logger.info(f"[custom_weather] Exception reading device {device_id}: {e}")
-            now = datetime.now().isoformat()
-            logger.info(f"[custom_weather] Datetime: {now}")
-            logger.info(f"[custom_weather] Error: {e}")
-
-            with open(csv_file, mode="a", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    now, device_id,
-                    None, None, None, None,    # GHI, DHI, DNI, GTI
-                    None, None, None, None,    # WindDir, WindSpeed, WindSpeed_2, WindSpeed_10
-                    None, None, None,          # AirTemp, Humidity, AirPres
-                    "Error"
-                ])
 
-            try:
-                if client.is_socket_open():
-                    client.close()
-                    logger.info("[custom_weather] Modbus client closed due to error.")
-            except Exception as close_err:
-                logger.info(f"[custom_weather] Error while closing client: {close_err}")
+            # --- Validate response ---
+            # An exception-response PDU is a valid reply with no registers
+            if not response or response.isError():
+                raise ValueError(f"Invalid or no Modbus response from device {device_id}")
 
-            sys.exit(1)
+            regs = response.registers
+            if len(regs) < 44:  # field table reads up to register index 43
+                raise ValueError(f"Incomplete response from device {device_id}")
 
-        # === Decode normal data ===
-        regs = response.registers
-        logger.info(f"[custom_weather] Raw registers ({len(regs)}):")
+        except Exception as e:
+            # Record the error row and open the breaker for this station
+            logger.error("[custom_weather] Error reading device %s: %s", device_id, e)
+            csv_appender.writerow(csv_file, [
+                datetime.now().isoformat(), device_id,
+                None, None, None, None,    # GHI, DHI, DNI, GTI
+                None, None, None, None,    # WindDir, WindSpeed, WindSpeed_2, WindSpeed_10
+                None, None, None,          # AirTemp, Humidity, AirPres
+                "Error"
+            ])
+            _breaker_trip(device_id)
+            continue
 
-        chunk_size = 20
-        for i in range(0, len(regs), chunk_size):
-            chunk = regs[i:i + chunk_size]
-            logger.info("[custom_weather] [" + ", ".join(f"{r}" for r in chunk) + "]")
-
-        # The order follows your XML <Point> tag definitions
-        GHI         = regs[0]   # 40015
-        DHI         = regs[1]   # 40016
-        DNI         = regs[2]   # 40017
-        GTI         = regs[3]   # 40018
-        WindDir     = regs[7]   # 40022
-        WindSpeed   = regs[8]   # 40023
-        WindSpeed_2 = regs[9]  # 40024
-        WindSpeed_10= regs[10]  # 40025
-        AirTemp     = regs[30]  # 40045
-        Humidity    = regs[37]  # 40052
-        AirPres     = regs[43]  # 40058
-
-        # Example scaling (assuming raw values are 0–1000 range as per XML span_high)
-        # Adjust scale factors below based on actual sensor register documentation
-        GHI         = GHI
-        DHI         = DHI
-        DNI         = DNI
-        GTI         = GTI
-        WindDir     = WindDir
-        WindSpeed   = WindSpeed / 10.0
-        WindSpeed_2 = WindSpeed_2 / 10.0
-        WindSpeed_10= WindSpeed_10 / 10.0
-        AirTemp     = AirTemp / 10.0
-        Humidity    = Humidity / 10.0
-        AirPres     = AirPres / 10.0
+        # === Decode normal data ===
+        logger.debug("[custom_weather] Raw registers (%d): %s", len(regs), regs)
 
         Error = "No error"
         now = datetime.now().isoformat()
 
-        logger.info(f"[custom_weather] Datetime: {now}")
-        logger.info(f"[custom_weather] GHI: {GHI} W/m^2")
-        logger.info(f"[custom_weather] DHI: {DHI} W/m^2")
-        logger.info(f"[custom_weather] DNI: {DNI} W/m^2")
-        logger.info(f"[custom_weather] GTI: {GTI} W/m^2")
-        logger.info(f"[custom_weather] WindDir: {WindDir} deg")
-        logger.info(f"[custom_weather] WindSpeed: {WindSpeed}")
-        logger.info(f"[custom_weather] WindSpeed_2: {WindSpeed_2}")
-        logger.info(f"[custom_weather] WindSpeed_10: {WindSpeed_10}")
-        logger.info(f"[custom_weather] AirTemp: {AirTemp} deg_C")
-        logger.info(f"[custom_weather] Humidity: {Humidity} %")
-        logger.info(f"[custom_weather] AirPres: {AirPres} hPa")
-
-        with open(csv_file, mode="a", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                now,
-                device_id,
-                round(GHI, 2),
-                round(DHI, 2),
-                round(DNI, 2),
-                round(GTI, 2),
-                round(WindDir, 1),
-                round(WindSpeed, 2),
-                round(WindSpeed_2, 2),
-                round(WindSpeed_10, 2),
-                round(AirTemp, 1),
-                round(Humidity, 1),
-                round(AirPres, 1),
-                Error
-            ])
\ No newline at end of file
+        # One pass over the field table drives scaling, logging, and the
+        # CSV row (log lines coalesced into a single record)
+        values = []
+        parts = [f"[custom_weather] Datetime: {now}"]
+        for name, idx, scale, unit, digits in _WEATHER_FIELDS:
+            value = regs[idx] / scale if scale != 1 else regs[idx]
+            parts.append(f"[custom_weather] {name}: {value} {unit}".rstrip())
+            values.append(round(value, digits))
+        logger.info("\n".join(parts))
+
+        _breaker_reset(device_id)
+        csv_appender.writerow(csv_file, [now, device_id, *values, Error])
\ No newline at end of file
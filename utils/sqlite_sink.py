@@ -0,0 +1,81 @@
+import csv
+import re
+import sys
+import sqlite3
+
+
+def _safe_name(name: str) -> str:
+    """Sanitize a table/column name down to [A-Za-z0-9_]."""
+    name = re.sub(r"\W", "_", name)
+    if not name or name[0].isdigit():
+        name = "_" + name
+    return name
+
+
+class SqliteSink:
+    """
+    Row sink backed by a single SQLite database in WAL mode.
+
+    Drop-in replacement for CsvAppender (same writerow/writerows/close
+    interface; the CSV path argument is ignored). WAL mode lets SQLite
+    coalesce writes instead of fsyncing per row, and a whole poll-cycle
+    batch goes in via one executemany call. Data can be dumped back to
+    CSV offline with:
+
+        python -m utils.sqlite_sink <db_file> <table> [out.csv]
+    """
+
+    def __init__(self, db_path: str, table: str, header: list):
+        if not header:
+            raise ValueError("SqliteSink requires a non-empty 'header' in the logging config")
+
+        self.table = _safe_name(table)
+        # check_same_thread=False: ThreadedRowSink drains writes from a
+        # single background thread, never concurrently with the creator
+        self._con = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("PRAGMA synchronous=NORMAL")
+
+        columns = ", ".join(f'"{_safe_name(col)}"' for col in header)
+        self._con.execute(f'CREATE TABLE IF NOT EXISTS "{self.table}" ({columns})')
+        placeholders = ", ".join("?" * len(header))
+        self._insert_sql = f'INSERT INTO "{self.table}" VALUES ({placeholders})'
+
+    def writerow(self, path: str, row: list) -> None:
+        """Insert one row (the CSV path is ignored; kept for interface parity)."""
+        self._con.execute(self._insert_sql, row)
+
+    def writerows(self, path: str, rows: list) -> None:
+        """Insert a batch of rows in one executemany call."""
+        if not rows:
+            return
+        self._con.executemany(self._insert_sql, rows)
+
+    def close(self) -> None:
+        self._con.close()
+
+
+def export_csv(db_path: str, table: str, out_path: str = None) -> None:
+    """Dump a logged table to CSV (stdout if no output path is given)."""
+    con = sqlite3.connect(db_path)
+    try:
+        cursor = con.execute(f'SELECT * FROM "{_safe_name(table)}"')
+        header = [col[0] for col in cursor.description]
+        out = open(out_path, "w", newline="") if out_path else sys.stdout
+        try:
+            writer = csv.writer(out)
+            writer.writerow(header)
+            writer.writerows(cursor)
+        finally:
+            if out_path:
+                out.close()
+    finally:
+        con.close()
+
+
+# --- If run directly ---
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4):
+        print("Usage: python -m utils.sqlite_sink <db_file> <table> [out.csv]")
+        sys.exit(1)
+    export_csv(sys.argv[1], sys.argv[2], sys.argv[3] if len(sys.argv) == 4 else None)
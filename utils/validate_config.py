@@ -1,50 +1,52 @@
 import json
 import sys
-from jsonschema import validate, ValidationError
+from jsonschema import Draft7Validator, ValidationError
+
+try:
+    # Optional C-level JSON parser; shaves config parse time on the
+    # systemd restart path. The stdlib parser is the fallback.
+    import orjson
+except ImportError:
+    orjson = None
 
 # --- JSON schema definition ---
+# The modbus section is validated by one of two specialized sub-schemas
+# picked by its "type" field, instead of a oneOf that evaluates every
+# branch (and hid a duplicate "port" definition in the shared block).
+tcp_modbus_schema = {
+    "type": "object",
+    "properties": {
+        "type": {"const": "tcp"},
+        "timeout": {"type": "number"},
+        "host": {"type": "string"},
+        "port": {"type": "integer"}
+    },
+    "required": ["type", "timeout", "host", "port"]
+}
+
+serial_modbus_schema = {
+    "type": "object",
+    "properties": {
+        "type": {"const": "serial"},
+        "timeout": {"type": "number"},
+        "port": {"type": "string"},
+        "baudrate": {"type": "integer"},
+        "stopbits": {"type": "integer"},
+        "bytesize": {"type": "integer"},
+        "parity": {"type": "string"}
+    },
+    "required": ["type", "timeout", "port", "baudrate", "stopbits", "bytesize", "parity"]
+}
+
 schema = {
     "type": "object",
     "properties": {
         "modbus": {
             "type": "object",
             "properties": {
-                "type": {"enum": ["tcp", "serial"]},
-
-                # TCP parameters
-                "host": {"type": "string"},
-                "port": {"type": "integer"},
-
-                # Serial parameters
-                "baudrate": {"type": "integer"},
-                "timeout": {"type": "number"},
-                "stopbits": {"type": "integer"},
-                "bytesize": {"type": "integer"},
-                "parity": {"type": "string"},
-                "port": {"type": ["string", "integer"]}
+                "type": {"enum": ["tcp", "serial"]}
             },
-            "required": ["type", "timeout"],
-            "oneOf": [
-                {   # Case 1: TCP
-                    "properties": {
-                        "type": {"const": "tcp"},
-                        "host": {"type": "string"},
-                        "port": {"type": "integer"}
-                    },
-                    "required": ["type", "host", "port"]
-                },
-                {   # Case 2: Serial
-                    "properties": {
-                        "type": {"const": "serial"},
-                        "port": {"type": "string"},
-                        "baudrate": {"type": "integer"},
-                        "stopbits": {"type": "integer"},
-                        "bytesize": {"type": "integer"},
-                        "parity": {"type": "string"}
-                    },
-                    "required": ["type", "port", "baudrate", "stopbits", "bytesize", "parity"]
-                }
-            ]
+            "required": ["type", "timeout"]
         },
 
         "device": {
@@ -73,7 +75,8 @@ schema = {
                     "items": {"type": "string"},
                     "minItems": 0
                 },
-                "time_step": {"type": "number"}
+                "time_step": {"type": "number"},
+                "db_file": {"type": "string"}
             },
             "required": ["base_folder", "log_retention_days", "file_suffix", "header", "time_step"]
         }
@@ -81,27 +84,40 @@ schema = {
     "required": ["modbus", "device", "logging"]
 }
 
+# Compile the schemas once at import; validate() would re-build the
+# validator (ref resolution, keyword dispatch) on every call
+_validator = Draft7Validator(schema)
+_modbus_validators = {
+    "tcp": Draft7Validator(tcp_modbus_schema),
+    "serial": Draft7Validator(serial_modbus_schema),
+}
+
 # --- Validator function ---
 def validate_config(config_path: str) -> dict:
     """Validate and return JSON config, with robust error handling."""
 
     # --- Check file existence first ---
     try:
-        with open(config_path, "r") as f:
-            config = json.load(f)
+        with open(config_path, "rb") as f:
+            raw = f.read()
+        # Both parsers raise ValueError subclasses on bad JSON
+        config = orjson.loads(raw) if orjson is not None else json.loads(raw)
     except FileNotFoundError:
         print(f"❌ Config file not found: {config_path}")
         sys.exit(1)
     except PermissionError:
         print(f"❌ Permission denied when trying to read: {config_path}")
         sys.exit(1)
-    except json.JSONDecodeError as e:
+    except ValueError as e:
         print(f"❌ JSON syntax error in {config_path}: {e}")
         sys.exit(1)
 
     # --- Schema validation ---
     try:
-        validate(instance=config, schema=schema)
+        _validator.validate(config)
+        # Dispatch on the connection type; the top-level schema already
+        # guarantees it is one of the two keys
+        _modbus_validators[config["modbus"]["type"]].validate(config["modbus"])
     except ValidationError as e:
         print(f"❌ Invalid config: {e.message}")
         sys.exit(1)